@@ -1,6 +1,6 @@
 import autograd.numpy as np 
 from autograd import grad, elementwise_grad
-from .Tensor import Tensor
+from .Tensor import Tensor, sum_to_batched_shape, align_batched
 
 """
 Add is an operation. when Add is called, an Adder object is 
@@ -33,11 +33,15 @@ readable.
 """
 class _Adder(object):
     def __init__(self, x, y):
-        self.x = float(x.val)
-        self.y = float(y.val)
+        # batched tensors carry arrays, so only cast scalars
+        self.x = float(x.val) if np.ndim(x.val) == 0 else x.val
+        self.y = float(y.val) if np.ndim(y.val) == 0 else y.val
+        self.x_batched = x.batched
+        self.y_batched = y.batched
         
     def evaluate(self):
-        return self.x + self.y
+        x, y = align_batched(self.x, self.x_batched, self.y, self.y_batched)
+        return x + y
 
     def f(self, x, y):
         return x + y
@@ -46,4 +50,12 @@ class _Adder(object):
         # return a list of gradients
         self.df_dx = elementwise_grad(self.f, 0)
         self.df_dy = elementwise_grad(self.f, 1)
-        return [self.df_dx(self.x, self.y), self.df_dy(self.x, self.y)]
\ No newline at end of file
+        return [self.df_dx(self.x, self.y), self.df_dy(self.x, self.y)]
+
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt this op's output, ie it has a
+        leading batch dimension. d(x + y)/dx = d(x + y)/dy = 1.
+        """
+        return [sum_to_batched_shape(g, self.x, self.x_batched), 
+                sum_to_batched_shape(g, self.y, self.y_batched)]
\ No newline at end of file
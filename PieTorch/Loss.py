@@ -20,6 +20,7 @@ class Loss(object):
 
         # everything is a tensor so wrap it with a tensor
         self.t.val = loss_
+        self.t.batched = output.batched
 
         # put output tensor in op so we compute dL/dx wrt x, where x=output
         self.op.x = output.val
@@ -59,4 +60,10 @@ class _Loss(object):
         # called by the tensor created by Loss
         self.df_dx = elementwise_grad(self.f, 0)  # return dL/dx, or loss' gradient wrt its parent
         # self.df_dy = elementwise_grad(self.f, 1)  # no need to compute gradient wrt y
-        return [self.df_dx(self.x, self.y)]
\ No newline at end of file
+        return [self.df_dx(self.x, self.y)]
+
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt the loss. d(x - y)/dx = 1.
+        """
+        return [g * np.ones_like(self.x, dtype=float)]
\ No newline at end of file
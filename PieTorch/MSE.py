@@ -25,6 +25,7 @@ class MSE(object):
 
         # compute scalar loss and wrap it with a tensor
         self.t.val = (output.val - y.val) ** 2
+        self.t.batched = output.batched
 
         # we need outputs to compute gradients for 2nd degree polynomials
         self.op.x = output.val
@@ -67,4 +68,11 @@ class _MSE(object):
         # called by the tensor created by Loss
         self.df_dx = elementwise_grad(self.f, 0)  # return dL/dx, or loss' gradient wrt its parent
         # self.df_dy = elementwise_grad(self.f, 1)  # no need to compute gradient wrt label
-        return [self.df_dx(self.x, self.y)]
\ No newline at end of file
+        return [self.df_dx(self.x, self.y)]
+
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt the loss. 
+        d((x - y) ** 2)/dx = 2 * (x - y).
+        """
+        return [g * 2 * (np.asarray(self.x) - self.y)]
\ No newline at end of file
@@ -1,6 +1,6 @@
 import numpy as np
 from autograd import grad, elementwise_grad
-from .Tensor import Tensor
+from .Tensor import Tensor, sum_to_batched_shape, align_batched
 
 
 class Matmul(object):
@@ -20,10 +20,36 @@ class _Matmultiplier(object):
     def __init__(self, x, y):
         self.x = x.val
         self.y = y.val
+        self.x_batched = x.batched
+        self.y_batched = y.batched
         
     def evaluate(self):
+        if self.x_batched or self.y_batched:
+            x, y = align_batched(*self._promote())
+            return self._demote(np.matmul(x, y))
         return np.dot(self.x, self.y)
 
+    def _promote(self):
+        """
+        per sample, turn a vector x into a row (1, d) and a vector y into a 
+        column (d, 1) so that np.matmul broadcasts over the batch dimension.
+        returns the arguments for align_batched.
+        """
+        x, y = np.asarray(self.x, dtype=float), np.asarray(self.y, dtype=float)
+        if x.ndim - self.x_batched == 1:
+            x = x[..., None, :]
+        if y.ndim - self.y_batched == 1:
+            y = y[..., None]
+        return x, self.x_batched, y, self.y_batched
+
+    def _demote(self, z):
+        """undo _promote on a batched result."""
+        if np.ndim(self.y) - self.y_batched == 1:
+            z = z[..., 0]
+        if np.ndim(self.x) - self.x_batched == 1:
+            z = z[..., 0] if np.ndim(self.y) - self.y_batched == 1 else z[..., 0, :]
+        return z
+
     def f(self, x, y):
         return np.dot(x, y)
 
@@ -31,4 +57,35 @@ class _Matmultiplier(object):
         # return a list of gradients
         self.df_dx = elementwise_grad(self.f, 0)
         self.df_dy = elementwise_grad(self.f, 1)
-        return [self.df_dx(self.x, self.y), self.df_dy(self.x, self.y)]
\ No newline at end of file
+        return [self.df_dx(self.x, self.y), self.df_dy(self.x, self.y)]
+
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt this op's output. with 
+        z = x @ y, dz/dx = g @ y.T and dz/dy = x.T @ g, computed per sample.
+        """
+        x_vector = np.ndim(self.x) - self.x_batched == 1
+        y_vector = np.ndim(self.y) - self.y_batched == 1
+        px, _, py, _ = self._promote()
+        x, y = align_batched(px, self.x_batched, py, self.y_batched)
+
+        # promote g to match the promoted output, ie (N, m, k). this undoes
+        # _demote, so x's row comes back first
+        g = np.asarray(g, dtype=float)
+        if x_vector:
+            g = np.expand_dims(g, -1 if y_vector else -2)
+        if y_vector:
+            g = g[..., None]
+
+        dx = np.matmul(g, np.swapaxes(y, -1, -2))
+        dy = np.matmul(np.swapaxes(x, -1, -2), g)
+
+        # sum out any dimensions numpy broadcast, then undo the promotion so 
+        # each gradient is (N,) + parent's shape
+        dx = sum_to_batched_shape(dx, px, self.x_batched)
+        dy = sum_to_batched_shape(dy, py, self.y_batched)
+        if x_vector:
+            dx = dx[..., 0, :]
+        if y_vector:
+            dy = dy[..., 0]
+        return [dx, dy]
\ No newline at end of file
@@ -0,0 +1,208 @@
+import gc
+import tracemalloc
+import numpy as np
+from .Tensor import Tensor, live_tensors, topological_sort
+
+
+class MemoryTracker(object):
+    """account for the memory held by live tensors and their ops.
+
+    a graph stays alive for as long as any of its tensors are reachable, eg
+    through a weight's children list or an op's saved x and y. MemoryTracker
+    makes this visible: how many tensors and ops are alive, how many bytes
+    they hold grouped by op type, and how much memory backward() peaks at.
+
+    used as a context manager, the tracker records the peak memory of every
+    backward pass run inside the block, ie Tensor.backward() and 
+    PerSampleGrad.
+
+    example
+    -------
+    with MemoryTracker() as tracker:
+        loss = criterion(model(data), target)
+        loss.backward()
+    print(tracker.peak_backward_bytes)
+    print(tracker.report())
+    """
+
+    def __init__(self):
+        self.peak_backward_bytes = 0  # largest backward() peak seen so far
+        self.n_backward = 0  # number of backward() calls observed
+        self._started_tracemalloc = False
+        self._backward_start_bytes = 0
+
+    def __enter__(self):
+        # only stop tracemalloc on exit if we were the ones who started it
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        Tensor.trackers.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Tensor.trackers.remove(self)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return False
+
+    def _start_backward(self):
+        """called by Tensor.start_backward_tracking() before any gradient is 
+        computed.
+
+        if tracemalloc was already tracing when the tracker was entered, its 
+        peak belongs to the caller and is not reset. peak_backward_bytes is
+        then an upper bound, since it may include a peak from before the pass.
+        """
+        self._backward_start_bytes = tracemalloc.get_traced_memory()[0]
+        if self._started_tracemalloc:
+            tracemalloc.reset_peak()
+
+    def _end_backward(self):
+        """called by Tensor.end_backward_tracking() once all gradients are 
+        accumulated."""
+        peak = tracemalloc.get_traced_memory()[1] - self._backward_start_bytes
+        self.peak_backward_bytes = max(self.peak_backward_bytes, peak)
+        self.n_backward += 1
+
+    def live_counts(self, collect=False):
+        """
+        return the number of live tensors and the number of live ops, grouped
+        by op type, eg {"Tensor": 7, "_Adder": 1, "_Multiplier": 1}.
+
+        tensors point at each other through parents and children, so a
+        dropped graph is only freed by the garbage collector. set collect=True
+        to run it first; whatever is still alive after that is truly
+        referenced, ie a leak.
+        """
+        if collect:
+            gc.collect()
+
+        counts = {"Tensor": 0}
+        seen_ops = set()
+        for T in list(live_tensors):
+            counts["Tensor"] += 1
+            if T.op is not None and id(T.op) not in seen_ops:
+                seen_ops.add(id(T.op))
+                op_type = type(T.op).__name__
+                counts[op_type] = counts.get(op_type, 0) + 1
+        return counts
+
+    def memory_by_op(self, collect=False):
+        """
+        return the bytes held by live tensors, grouped by the type of the op
+        that created them. leaf tensors (ie weights and inputs) have no op and
+        are grouped under "Leaf".
+
+        each group reports the bytes held by .val, .grad and .accumulated_grad
+        and the bytes of inputs the op saved for its gradient, eg _Adder's x
+        and y. "total" sums all of them.
+
+        every array buffer is counted once. ops often keep a reference to 
+        their parent's .val rather than a copy, eg _Matmultiplier's x, so 
+        "saved" only counts arrays that no live tensor already holds. scalars
+        are always counted.
+        """
+        if collect:
+            gc.collect()
+
+        usage = {}
+        seen_buffers = set()
+        tensors = list(live_tensors)
+
+        # first, the values and gradients the tensors hold themselves
+        for T in tensors:
+            group = "Leaf" if T.op is None else type(T.op).__name__
+            if group not in usage:
+                usage[group] = {"val": 0, "grad": 0, "saved": 0, "total": 0}
+
+            usage[group]["val"] += _nbytes(T.val, seen_buffers)
+            usage[group]["grad"] += (_nbytes(T.grad, seen_buffers) 
+                                     + _nbytes(T.accumulated_grad, seen_buffers))
+
+        # then, whatever the ops saved on top of that. an op can be shared, eg
+        # Loss reuses one op across calls
+        seen_ops = set()
+        for T in tensors:
+            if T.op is not None and id(T.op) not in seen_ops:
+                seen_ops.add(id(T.op))
+                group = type(T.op).__name__
+                usage[group]["saved"] += sum(_nbytes(v, seen_buffers) 
+                                             for v in vars(T.op).values())
+
+        for group in usage.values():
+            group["total"] = group["val"] + group["grad"] + group["saved"]
+        return usage
+
+    def report(self, collect=False):
+        """return a human readable summary, largest op type first."""
+        counts = self.live_counts(collect=collect)
+        usage = self.memory_by_op()
+
+        lines = ["live tensors: %d" % counts["Tensor"]]
+        lines.append("peak backward: %d bytes over %d call(s)"
+                     % (self.peak_backward_bytes, self.n_backward))
+        lines.append("%-16s %6s %10s %10s %10s %10s"
+                     % ("op", "count", "val", "grad", "saved", "total"))
+
+        for group, b in sorted(usage.items(), key=lambda kv: -kv[1]["total"]):
+            count = counts.get(group, "-")
+            lines.append("%-16s %6s %10d %10d %10d %10d"
+                         % (group, count, b["val"], b["grad"], b["saved"], b["total"]))
+        return "\n".join(lines)
+
+
+def graph_stats(root):
+    """summarize the graph that root depends on.
+
+    walks upwards from root through parents, the same direction as backward().
+
+    returns a dict with
+        nodes : number of tensors in root's ancestry, root included
+        depth : number of edges on the longest path from root to a leaf
+        max_fan_in, mean_fan_in : number of parents per tensor
+        max_fan_out, mean_fan_out : number of children per tensor. children
+            left over from earlier forward passes are counted, so a fan-out
+            that keeps growing across iterations points at a leak.
+    """
+    ls_nodes = topological_sort(root)
+
+    # longest path to a leaf, ie the depth of backward()'s recursion. visit 
+    # parents before children so every parent's depth is already known
+    depth = {}
+    for T in reversed(ls_nodes):
+        depth[T] = 1 + max([depth[p] for p in T.parents], default=-1)
+
+    fan_in = [len(T.parents) for T in ls_nodes]
+    fan_out = [len(T.children) for T in ls_nodes]
+    return {
+        "nodes": len(ls_nodes),
+        "depth": depth[root],
+        "max_fan_in": max(fan_in),
+        "mean_fan_in": float(np.mean(fan_in)),
+        "max_fan_out": max(fan_out),
+        "mean_fan_out": float(np.mean(fan_out)),
+    }
+
+
+def _nbytes(v, seen_buffers):
+    """bytes held by a value that have not been counted yet. scalars count as 
+    a float64 every time they appear; anything else, eg the df_dx functions 
+    ops cache, is not a tensor value and counts as 0.
+
+    an array is counted by the buffer it owns, so views and references to an 
+    already counted array count as 0. seen_buffers is updated in place.
+    """
+    if isinstance(v, np.ndarray):
+        while isinstance(v.base, np.ndarray):
+            v = v.base
+        if id(v) in seen_buffers:
+            return 0
+        seen_buffers.add(id(v))
+        return v.nbytes
+
+    # python reuses scalar objects, eg small ints and the float max(0, x) 
+    # returns, so scalars are never deduplicated
+    if isinstance(v, (int, float, np.number)) and not isinstance(v, bool):
+        return 8
+    return 0
@@ -1,6 +1,6 @@
 import autograd.numpy as np 
 from autograd import grad, elementwise_grad
-from .Tensor import Tensor
+from .Tensor import Tensor, sum_to_batched_shape, align_batched
 
 class Multiply(object):
     def __new__(self, x, y):
@@ -18,11 +18,15 @@ class Multiply(object):
         
 class _Multiplier(object):
     def __init__(self, x, y):
-        self.x = float(x.val)
-        self.y = float(y.val)
+        # batched tensors carry arrays, so only cast scalars
+        self.x = float(x.val) if np.ndim(x.val) == 0 else x.val
+        self.y = float(y.val) if np.ndim(y.val) == 0 else y.val
+        self.x_batched = x.batched
+        self.y_batched = y.batched
         
     def evaluate(self):
-        return self.x * self.y
+        x, y = align_batched(self.x, self.x_batched, self.y, self.y_batched)
+        return x * y
 
     def f(self, a, b):
         return a * b
@@ -31,4 +35,13 @@ class _Multiplier(object):
         # partial derivatives https://github.com/HIPS/autograd/issues/437
         self.df_dx = elementwise_grad(self.f, 0)
         self.df_dy = elementwise_grad(self.f, 1)
-        return [self.df_dx(self.x, self.y), self.df_dy(self.x, self.y)]
\ No newline at end of file
+        return [self.df_dx(self.x, self.y), self.df_dy(self.x, self.y)]
+
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt this op's output. 
+        d(x * y)/dx = y and d(x * y)/dy = x.
+        """
+        x, y = align_batched(self.x, self.x_batched, self.y, self.y_batched)
+        return [sum_to_batched_shape(g * y, self.x, self.x_batched), 
+                sum_to_batched_shape(g * x, self.y, self.y_batched)]
\ No newline at end of file
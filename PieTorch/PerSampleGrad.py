@@ -0,0 +1,93 @@
+import numpy as np
+from .Tensor import Tensor, topological_sort
+
+
+class PerSampleGrad(object):
+    """compute one gradient per sample for every parameter of a model, using a
+    single vectorized forward and backward pass.
+
+    rather than calling Tensor.backward() once per sample, the whole batch is
+    fed through the model as one batched Tensor. every op then carries the
+    leading batch dimension through its closed-form gradient (see each op's
+    compute_parents_batched_grads), so a parameter's gradient comes out as a
+    stacked ndarray with one slice per sample.
+
+    parameters
+    ----------
+    model : Module
+        its forward() must be built from Add, Multiply, Pow, Relu and Matmul.
+    criterion : Loss or MSE
+        the loss is computed per sample, ie it is not averaged over the batch.
+
+    example
+    -------
+    per_sample_grad = PerSampleGrad(model, MSE())
+    grads = per_sample_grad(data, target)  # data.shape[0] == N
+    grads[0].shape  # (N,) + model.parameters()[0].val.shape
+    """
+
+    def __init__(self, model, criterion):
+        self.model = model
+        self.criterion = criterion
+
+    def __call__(self, x, y):
+        """
+        x and y have a leading batch dimension, eg x[i] and y[i] are the i-th
+        sample. returns a list of stacked gradients, in the same order as
+        model.parameters().
+        """
+
+        # the batch dimension rides along on the input and target tensors
+        x = Tensor(val=np.asarray(x, dtype=float), name="input", batched=True)
+        y = Tensor(val=np.asarray(y, dtype=float), name="target", batched=True)
+        n_samples = x.val.shape[0]
+        if y.val.shape[:1] != (n_samples,):
+            raise ValueError("target has %s samples but input has %d" 
+                             % (y.val.shape[:1], n_samples))
+
+        output = self.model(x)
+
+        # Loss and MSE broadcast like numpy, which does not line up the batch
+        # dimension. eg an output of shape (N,) and a target of shape (N, 1)
+        # would broadcast to (N, N) and mix samples, so the target takes the 
+        # output's shape whenever it holds the same values
+        if y.val.shape != np.shape(output.val) and y.val.size == np.size(output.val):
+            y.val = np.reshape(y.val, np.shape(output.val))
+
+        loss = self.criterion(output, y)
+        if np.shape(loss.val) != np.shape(output.val):
+            raise ValueError("loss of shape %s does not match output of shape %s" 
+                             % (np.shape(loss.val), np.shape(output.val)))
+
+        # seed with dL/dL = 1 for every sample. we start the sweep from output
+        # rather than loss.parents because Loss and MSE only connect to the
+        # output of their first call.
+        seed = np.ones((n_samples,) + np.shape(loss.val)[1:])
+        grads = {output: loss.op.compute_parents_batched_grads(seed)[0]}
+
+        # vectorized backward: visit each op once, after all of its children
+        Tensor.start_backward_tracking()
+        try:
+            for T in topological_sort(output):
+                if T.terminal:
+                    continue
+                g = grads.pop(T)
+                ls_gradients = T.op.compute_parents_batched_grads(g)
+                for parent, parent_grad in zip(T.parents, ls_gradients):
+                    # a tensor used more than once sums its gradients
+                    if parent in grads:
+                        grads[parent] = grads[parent] + parent_grad
+                    else:
+                        grads[parent] = parent_grad
+        finally:
+            Tensor.end_backward_tracking()
+
+        # parameters the loss does not depend on get a zero gradient
+        ls_grads = []
+        for T in self.model.parameters():
+            if T in grads:
+                ls_grads.append(grads[T])
+            else:
+                ls_grads.append(np.zeros((n_samples,) + np.shape(T.val)))
+        return ls_grads
+
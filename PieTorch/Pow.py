@@ -1,6 +1,6 @@
 import autograd.numpy as np 
 from autograd import grad, elementwise_grad
-from .Tensor import Tensor
+from .Tensor import Tensor, sum_to_batched_shape
 
 class Pow(object):
     """Return a new tensor object as part of an exponent operation.
@@ -28,8 +28,10 @@ class _Power(object):
     returns a _Power object, which knows its base, exponents, and gradient.,
     """
     def __init__(self, x, y):
-        self.x = float(x.val)
+        # batched tensors carry arrays, so only cast scalars
+        self.x = float(x.val) if np.ndim(x.val) == 0 else x.val
         self.y = float(y)  # y is not a tensor since it's an exponent
+        self.x_batched = x.batched
         
     def evaluate(self):
         return self.x ** self.y
@@ -42,4 +44,12 @@ class _Power(object):
         self.df_dx = elementwise_grad(self.f, 0)
         return [self.df_dx(self.x, self.y)]
 
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt this op's output. 
+        d(x ** y)/dx = y * x ** (y - 1).
+        """
+        return [sum_to_batched_shape(g * self.y * self.x ** (self.y - 1), 
+                                     self.x, self.x_batched)]
+
 
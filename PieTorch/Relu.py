@@ -1,6 +1,6 @@
 import autograd.numpy as np 
 from autograd import grad, elementwise_grad
-from .Tensor import Tensor
+from .Tensor import Tensor, sum_to_batched_shape
 
 class Relu(object):
     def __new__(self, x):
@@ -15,14 +15,26 @@ class Relu(object):
         
 class _Relu(object):
     def __init__(self, x):
-        self.x = float(x.val)
+        # batched tensors carry arrays, so only cast scalars
+        self.x = float(x.val) if np.ndim(x.val) == 0 else x.val
+        self.x_batched = x.batched
         
     def evaluate(self):
-        return max(0, self.x)
+        if np.ndim(self.x) == 0:
+            return max(0, self.x)
+        return np.maximum(0, self.x)
 
     def compute_parents_grads(self):
         if self.x > 0:
             self.df_dx = 1
         else:
             self.df_dx = 0
-        return [self.df_dx]
\ No newline at end of file
+        return [self.df_dx]
+
+    def compute_parents_batched_grads(self, g):
+        """
+        g is the batched gradient of the root wrt this op's output. relu passes
+        the gradient through wherever x > 0.
+        """
+        return [sum_to_batched_shape(g * (np.asarray(self.x) > 0), self.x, 
+                                     self.x_batched)]
\ No newline at end of file
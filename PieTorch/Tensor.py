@@ -13,12 +13,28 @@ through its children.
 
 a Tensor's gradient is wrt its child. if F = Q + Z, then Q.grad is
 dF/dQ. ie to increase F, update Q by df/dQ.
+
+a Tensor may be batched. a batched Tensor's val carries a leading batch 
+dimension, one slice per sample. a Tensor created from an operation is batched 
+if any of its parents are batched. see PerSampleGrad.
 """
+import weakref
+import numpy as np
+
+# every Tensor that has not been garbage collected yet. see MemoryTracker.
+live_tensors = weakref.WeakSet()
+
 
 class Tensor(object):
-    def __init__(self, terminal=True, val=0, parents=[], forward=None, 
-                 name=None, op=None):
+    trackers = []  # active MemoryTrackers, notified around backward()
+
+    def __init__(self, terminal=True, val=0, parents=None, forward=None, 
+                 name=None, op=None, batched=None):
         
+        # a fresh list per Tensor, since Loss and MSE append to their parents
+        if parents is None:
+            parents = []
+
         self.val = val
         self.parents = parents  # eg C = A + B, then A and B are C's parents
         self.children = []  # eg C = A + B, then C is A's and B's child 
@@ -30,6 +46,13 @@ class Tensor(object):
         self.terminal = terminal
         self.color = "White"  # used for dfs
         self.stack = []
+
+        # an op's Tensor inherits its batch dimension from its parents. a 
+        # leaf is only batched if it says so, eg PerSampleGrad's input
+        if batched is None:
+            batched = op is not None and any(p.batched for p in self.parents)
+        self.batched = batched
+        live_tensors.add(self)
         
         # when Tensor is instantiated from an operation, it will have parents
         if len(self.parents) > 0:
@@ -53,19 +76,39 @@ class Tensor(object):
         then, it prints a trace from a leaf to the root Tensor. (the
         root Tensor is the caller, eg Loss.backward().)
         """
-        
-        # step 1: populate every tensor with its gradient
-        self._compute_grad(self)
-        self.grad = 1  # dL/dL is 1
-        
-        # step 2: accumulate gradients using dfs
-        self.color = "Gray"
-        self.stack.append(self)
-        self._dfs()
+        Tensor.start_backward_tracking()
+        try:
+            # step 1: populate every tensor with its gradient
+            self._compute_grad(self)
+            self.grad = 1  # dL/dL is 1
+            
+            # step 2: accumulate gradients using dfs
+            self.color = "Gray"
+            self.stack.append(self)
+            self._dfs()
+
+            # step 3: reset every tensor by marking it "white"
+            self.stack.append(self)
+            self._mark_tensors_white()
+        finally:
+            # a failed pass is still a pass, so trackers always hear its end
+            Tensor.end_backward_tracking()
 
-        # step 3: reset every tensor by marking it "white"
-        self.stack.append(self)
-        self._mark_tensors_white()
+    @staticmethod
+    def start_backward_tracking():
+        """
+        notify active MemoryTrackers that a backward pass is starting. called 
+        by backward() and by anything else that sweeps a graph backwards, eg 
+        PerSampleGrad.
+        """
+        for tracker in Tensor.trackers:
+            tracker._start_backward()
+
+    @staticmethod
+    def end_backward_tracking():
+        """notify active MemoryTrackers that a backward pass has finished."""
+        for tracker in Tensor.trackers:
+            tracker._end_backward()
 
 
     def _compute_grad(self, T):
@@ -209,4 +252,78 @@ class Tensor(object):
     def item(self):
         """included so we can match pytorchs api.
         """
-        return self.val
\ No newline at end of file
+        return self.val
+
+
+def sum_to_batched_shape(g, val, batched):
+    """reduce a batched gradient g so that it matches val, one slice per sample.
+
+    g always has a leading batch dimension, eg (N, 3). val may or may not have
+    one. if val is not batched (eg a weight shared by every sample), g is 
+    reduced to (N,) + val.shape so that every sample keeps its own gradient.
+    any dimensions that numpy broadcast in the forward pass are summed out.
+    """
+    shape = np.shape(val)[1:] if batched else np.shape(val)
+
+    # sum out leading dimensions added by broadcasting, eg scalar + vector
+    n_extra = g.ndim - 1 - len(shape)
+    if n_extra < 0:
+        raise ValueError("gradient of shape %s cannot be reduced to %s per sample" 
+                         % (g.shape, shape))
+    if n_extra > 0:
+        g = g.sum(axis=tuple(range(1, 1 + n_extra)))
+
+    # sum out dimensions that were stretched from size 1
+    axes = tuple(i + 1 for i, d in enumerate(shape) if d == 1 and g.shape[i + 1] != 1)
+    if len(axes) > 0:
+        g = g.sum(axis=axes, keepdims=True)
+    return g
+
+
+
+def align_batched(x, x_batched, y, y_batched):
+    """line up the batch dimension of x and y before numpy broadcasts them.
+
+    numpy lines up trailing dimensions, so a batched operand with fewer 
+    dimensions per sample than the other operand would have its batch 
+    dimension broadcast against the other's data, eg x of shape (N,) times W 
+    of shape (3,). pad the batched operand with size 1 dimensions after its 
+    batch dimension, eg x becomes (N, 1), so that sample i only meets sample i.
+    """
+    x_rank = np.ndim(x) - x_batched
+    y_rank = np.ndim(y) - y_batched
+    if x_batched and x_rank < y_rank:
+        x = np.reshape(x, np.shape(x)[:1] + (1,) * (y_rank - x_rank) + np.shape(x)[1:])
+    if y_batched and y_rank < x_rank:
+        y = np.reshape(y, np.shape(y)[:1] + (1,) * (x_rank - y_rank) + np.shape(y)[1:])
+    return x, y
+
+
+
+def topological_sort(root):
+    """return every tensor in root's ancestry, root and leaves included, 
+    ordered so that a tensor always comes before its parents. this is the 
+    order a backward sweep visits them in.
+    """
+    ls_order = []
+    visited = set()
+    stack = [(root, False)]
+
+    while len(stack) > 0:
+        T, parents_done = stack.pop()
+
+        # all of T's parents have been ordered, so T can be placed
+        if parents_done:
+            ls_order.append(T)
+            continue
+
+        if T in visited:
+            continue
+        visited.add(T)
+
+        stack.append((T, True))
+        for parent in T.parents:
+            stack.append((parent, False))
+
+    # ls_order lists parents before children, so reverse it
+    return list(reversed(ls_order))
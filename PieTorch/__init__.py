@@ -7,4 +7,6 @@ from .Module import Module
 from .Loss import Loss
 from .Optimizer import Optimizer
 from .Matmul import Matmul
-from .MSE import MSE
\ No newline at end of file
+from .MSE import MSE
+from .PerSampleGrad import PerSampleGrad
+from .MemoryTracker import MemoryTracker, graph_stats
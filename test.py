@@ -1,6 +1,91 @@
 import numpy as np
+import tracemalloc
 import unittest
-from nn import Tensor, Add, Multiply, Module, Relu, Pow, Loss, Optimizer, Matmul
+from nn import Tensor, Add, Multiply, Module, Relu, Pow, Loss, Optimizer, Matmul, MSE, PerSampleGrad, \
+    MemoryTracker, graph_stats
+
+
+class Linear(Module):
+    def __init__(self):
+        super(Linear, self).__init__()
+        self.W = Tensor(val=np.array([1., -2., 3.]), name="W")
+
+    def forward(self, x):
+        return Matmul(x, self.W)
+
+
+class LinearRelu(Module):
+    def __init__(self):
+        super(LinearRelu, self).__init__()
+        self.W = Tensor(val=np.array([1., -2., 3.]), name="W")
+        self.b = Tensor(val=0.5, name="b")
+
+    def forward(self, x):
+        return Relu(Add(Matmul(x, self.W), self.b))
+
+
+class LeftLinear(Module):
+    def __init__(self):
+        super(LeftLinear, self).__init__()
+        self.W = Tensor(val=np.array([[1., -2., 3.], [0.5, 1., -1.]]), name="W")
+
+    def forward(self, x):
+        return Matmul(self.W, x)
+
+
+class Poly(Module):
+    def __init__(self):
+        super(Poly, self).__init__()
+        self.a = Tensor(val=1.5, name="a")
+
+    def forward(self, x):
+        # a is used twice, so its gradients are summed
+        return Add(Multiply(Pow(x, 2), self.a), Multiply(x, self.a))
+
+
+class ScalarInput(Module):
+    def __init__(self):
+        super(ScalarInput, self).__init__()
+        self.W = Tensor(val=np.array([1., -2., 3.]), name="W")
+
+    def forward(self, x):
+        return Matmul(Multiply(x, self.W), self.W)
+
+
+class BroadcastBias(Module):
+    def __init__(self):
+        super(BroadcastBias, self).__init__()
+        self.b = Tensor(val=np.array([[0.5, -1., 2.]]), name="b")
+        self.v = Tensor(val=np.array([1., 2., 3.]), name="v")
+
+    def forward(self, x):
+        return Matmul(Add(x, self.b), self.v)
+
+
+def finite_difference_grads(model, Criterion, x, y, eps=1e-6):
+    """
+    per-sample gradients by central differences, feeding one unbatched sample 
+    at a time. used to check PerSampleGrad.
+    """
+    ls_grads = []
+    for T in model.parameters():
+        val = np.array(T.val, dtype=float)
+        g = np.zeros((len(x),) + val.shape)
+        for i in range(len(x)):
+            for j in np.ndindex(val.shape):
+                losses = []
+                for step in [eps, -eps]:
+                    perturbed = val.copy()
+                    perturbed[j] += step
+                    T.val = perturbed if val.ndim > 0 else float(perturbed)
+                    output = model(Tensor(val=x[i], name="input"))
+                    loss = Criterion()(output, Tensor(val=y[i], name="target"))
+                    losses.append(np.sum(loss.val))
+                g[(i,) + j] = (losses[0] - losses[1]) / (2 * eps)
+        T.val = val if val.ndim > 0 else float(val)
+        ls_grads.append(g)
+    return ls_grads
+
 
 class Test_PieTorch(unittest.TestCase):
 
@@ -61,5 +146,144 @@ class Test_PieTorch(unittest.TestCase):
         z = Matmul(x, y)
         self.assertEqual(z.val, 3.0)        
 
+    def test_per_sample_grad(self):
+        x_vec = np.array([[1., 2., 3.], [-1., 0., 2.], [3., 1., -2.], [0., 1., 0.]])
+        x_scalar = np.array([1., 2., -1., 0.5])  # N != 3
+        cases = [
+            ("matmul", Linear, MSE, np.arange(12.).reshape(4, 3), np.zeros(4)),
+            ("matmul, (N, 1) target", Linear, MSE, np.arange(12.).reshape(4, 3), 
+             np.zeros((4, 1))),
+            ("relu", LinearRelu, MSE, x_vec, np.array([1., 2., 3., 4.])),
+            ("relu, (N, 1) target", LinearRelu, MSE, x_vec, 
+             np.array([[1.], [2.], [3.], [4.]])),
+            ("left matmul", LeftLinear, MSE, x_vec, np.ones((4, 2))),
+            ("shared weight", Poly, Loss, np.array([1., -2., 3., 0.5, 2.]), np.zeros(5)),
+            ("scalar input", ScalarInput, MSE, x_scalar, np.array([1., 0., 2., -1.])),
+            ("broadcast bias", BroadcastBias, MSE, x_vec, np.ones((4, 1))),
+        ]
+        for name, Net, Criterion, x, y in cases:
+            with self.subTest(name):
+                model = Net()
+                grads = PerSampleGrad(model, Criterion())(x, y)
+                expected = finite_difference_grads(model, Criterion, x, y)
+                for g, g_expected in zip(grads, expected):
+                    self.assertEqual(g.shape, g_expected.shape)
+                    self.assertTrue(np.allclose(g, g_expected, atol=1e-4))
+
+    def test_per_sample_grad_target_mismatch(self):
+        x = np.arange(12.).reshape(4, 3)
+        with self.assertRaises(ValueError):
+            PerSampleGrad(Linear(), MSE())(x, np.zeros(3))  # 3 targets, 4 inputs
+        with self.assertRaises(ValueError):
+            PerSampleGrad(Linear(), MSE())(x, np.zeros((4, 2)))  # (N, 2) loss
+
+    def test_per_sample_grad_repeat(self):
+        x = np.array([[1., 2., 3.], [-1., 0., 2.]])
+        y = np.array([1., 2.])
+        dW_1, = PerSampleGrad(Linear(), MSE())(x, y)
+
+        # weights built after a first call must not be marked batched
+        self.assertFalse(Tensor(val=1.).batched)
+
+        model = Linear()
+        dW_2, = PerSampleGrad(model, MSE())(x, y)
+        dW_3, = PerSampleGrad(model, MSE())(x, y)
+        self.assertTrue(np.allclose(dW_2, dW_1))
+        self.assertTrue(np.allclose(dW_3, dW_1))
+
+    def test_memory_tracker(self):
+        with MemoryTracker() as tracker:
+            self.F.backward()
+        self.assertEqual(tracker.n_backward, 1)
+
+        # other tests' graphs may still be alive, so compare before and after
+        n_before = tracker.live_counts()
+        G = Multiply(self.F, self.Z)
+        self.assertEqual(tracker.live_counts()["Tensor"], n_before["Tensor"] + 1)
+        self.assertEqual(tracker.live_counts()["_Multiplier"], 
+                         n_before["_Multiplier"] + 1)
+
+    def test_memory_by_op_matmul(self):
+        class Net(Module):
+            def __init__(self):
+                super(Net, self).__init__()
+                self.W = Tensor(val=np.ones(1000), name="W")
+
+            def forward(self, x):
+                return Matmul(x, self.W)
+
+        tracker = MemoryTracker()
+        before = tracker.memory_by_op()
+        x = Tensor(val=np.ones(1000), name="input")
+        c = Net()(x)
+        usage = tracker.memory_by_op()
+
+        # _Matmultiplier references x.val and W.val rather than copying them,
+        # so only the two leaves' 8000 bytes and c's 8 byte result are held
+        def total(usage, group):
+            return usage.get(group, {"total": 0})["total"]
+        self.assertEqual(total(usage, "Leaf") - total(before, "Leaf"), 16000)
+        self.assertEqual(usage["_Matmultiplier"]["saved"], 0)
+        self.assertEqual(total(usage, "_Matmultiplier") 
+                         - total(before, "_Matmultiplier"), 8)
+
+    def test_memory_by_op_scalars(self):
+        tracker = MemoryTracker()
+        before = tracker.memory_by_op(collect=True)["Leaf"]["val"]
+
+        # python hands out the same object for small ints, but each leaf
+        # still holds its own value
+        leaves = [Tensor(val=1, name="X") for i in range(100)]
+        self.assertEqual(tracker.memory_by_op(collect=True)["Leaf"]["val"] - before, 
+                         100 * 8)
+
+    def test_memory_tracker_failed_backward(self):
+        class Broken(object):
+            def compute_parents_grads(self):
+                raise RuntimeError("broken op")
+
+        T = Tensor(val=1., parents=[Tensor(val=2.)], op=Broken(), terminal=False)
+        with MemoryTracker() as tracker:
+            with self.assertRaises(RuntimeError):
+                T.backward()
+        self.assertEqual(tracker.n_backward, 1)
+
+    def test_memory_tracker_keeps_caller_peak(self):
+        tracemalloc.start()
+        try:
+            big = np.ones(100000)
+            del big
+            caller_peak = tracemalloc.get_traced_memory()[1]
+            with MemoryTracker():
+                self.F.backward()
+            self.assertTrue(tracemalloc.get_traced_memory()[1] >= caller_peak)
+        finally:
+            tracemalloc.stop()
+
+    def test_peak_backward_bytes(self):
+        class Net(Module):
+            def __init__(self):
+                super(Net, self).__init__()
+                self.W = Tensor(val=np.ones((10, 100)), name="W")
+
+            def forward(self, x):
+                return Matmul(x, self.W)
+
+        x = np.ones((1000, 10))
+        y = np.ones((1000, 100))
+        with MemoryTracker() as tracker:
+            dW, = PerSampleGrad(Net(), MSE())(x, y)
+
+        # the per-sample gradients alone are 1000 * 10 * 100 float64s
+        self.assertEqual(tracker.n_backward, 1)
+        self.assertTrue(tracker.peak_backward_bytes >= dW.nbytes)
+
+    def test_graph_stats(self):
+        stats = graph_stats(self.F)  # F = (X + Y) * Z
+        self.assertEqual(stats["nodes"], 5)
+        self.assertEqual(stats["depth"], 2)
+        self.assertEqual(stats["max_fan_in"], 2)
+        self.assertEqual(stats["max_fan_out"], 1)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file